@@ -1,11 +1,25 @@
 """FastAPI server for Truth Social investment sentiment analysis."""
 
+import asyncio
+import heapq
+import logging
 import os
-from fastapi import FastAPI, HTTPException
+import random
+import secrets
+import time
+from contextlib import asynccontextmanager, suppress
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from operator import attrgetter
 from pydantic import BaseModel
 from typing import Optional
 from dotenv import load_dotenv
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
 
 # Load environment variables
 load_dotenv()
@@ -18,11 +32,116 @@ except ImportError:
     # When running locally with nested folder structure
     from truthbrush.truthbrush.investment_client import InvestmentClient, SECTORS
 
+# Sector keys never change at runtime; build the listing once
+SECTOR_KEYS: tuple[str, ...] = tuple(SECTORS)
+
+# Log level for the server and the truthbrush client loggers
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info").lower()
+logging.getLogger().setLevel(LOG_LEVEL.upper())
+log = logging.getLogger(__name__)
+
+# Response cache settings
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "60"))
+MAX_LIMIT = 50
+
+# Background refresh of hot sector responses (0 disables)
+PREWARM_INTERVAL_SECONDS = int(os.getenv("PREWARM_INTERVAL_SECONDS", "300"))
+PREWARM_LIMIT = int(os.getenv("PREWARM_LIMIT", "15"))
+# Only (endpoint, sector) pairs requested at PREWARM_LIMIT within this window
+# are refreshed
+PREWARM_RECENT_SECONDS = int(os.getenv("PREWARM_RECENT_SECONDS", "900"))
+PREWARM_RECENT_KEY = "prewarm:recent"
+PREWARM_LOCK_KEY = "prewarm:lock"
+
+# Prewarming may use at most half of the upstream Truth Social budget, so cache
+# misses still get slots. Approximate upstream calls per refresh (trending:
+# lookup and a page for each of 3 accounts; posts: one search per hashtag)
+# set the pause after each refresh.
+UPSTREAM_RATE_PER_MINUTE = int(os.getenv("TRUTHSOCIAL_RATE_PER_MINUTE", "30"))
+PREWARM_CALLS = {"trending": 6, "posts": 5}
+PREWARM_GAP_SECONDS = {
+    prefix: calls * 60 / (UPSTREAM_RATE_PER_MINUTE / 2) for prefix, calls in PREWARM_CALLS.items()
+}
+# Upper bound on one refresh cycle (pauses, jitter and a build allowance for
+# every endpoint of every sector); the lock is held at most this long
+PREWARM_BUILD_ALLOWANCE_SECONDS = 10
+PREWARM_CYCLE_SECONDS = int(len(SECTOR_KEYS) * sum(
+    gap + 3 + PREWARM_BUILD_ALLOWANCE_SECONDS for gap in PREWARM_GAP_SECONDS.values()
+))
+# Cycles start every max(interval, cycle) seconds, and a key can move within
+# the cycle, so entries outlive the gap between two refreshes
+PREWARM_TTL_SECONDS = max(PREWARM_INTERVAL_SECONDS, PREWARM_CYCLE_SECONDS) + PREWARM_CYCLE_SECONDS + 120
+
+# Holder-only lock update: keep the lock until the next cycle is due, or drop it
+# if that is already the case
+PREWARM_RESCHEDULE_SCRIPT = """
+if redis.call('get', KEYS[1]) ~= ARGV[1] then return 0 end
+if tonumber(ARGV[2]) > 0 then return redis.call('pexpire', KEYS[1], ARGV[2]) end
+return redis.call('del', KEYS[1])
+"""
+
+# Per-client limit on endpoints that fan out to Truth Social. Counters fall
+# back to process memory while Redis is unreachable, so an outage never fails
+# requests
+RATE_LIMIT = os.getenv("RATE_LIMIT", "10/minute")
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=REDIS_URL or "memory://",
+    in_memory_fallback_enabled=True,
+    swallow_errors=True,
+)
+
+
+def create_client() -> Optional[InvestmentClient]:
+    """Create the investment client from environment credentials, if any."""
+    username = os.getenv("TRUTHSOCIAL_USERNAME")
+    password = os.getenv("TRUTHSOCIAL_PASSWORD")
+    token = os.getenv("TRUTHSOCIAL_TOKEN")
+
+    if token:
+        return InvestmentClient(token=token)
+    if username and password:
+        return InvestmentClient(username=username, password=password)
+    return None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create and log in the shared investment client, Redis response cache and prewarm task."""
+    app.state.client = create_client()
+    if app.state.client is not None:
+        # Log in before serving traffic; on failure requests retry the login
+        try:
+            await asyncio.to_thread(app.state.client.login)
+        except Exception as e:
+            log.error("Truth Social login failed at startup: %s", e)
+    app.state.redis = aioredis.from_url(REDIS_URL) if REDIS_URL else None
+
+    prewarm_task = None
+    if app.state.client is not None and app.state.redis is not None and PREWARM_INTERVAL_SECONDS > 0:
+        prewarm_task = asyncio.create_task(prewarm_cache(app.state.client))
+
+    yield
+
+    if prewarm_task is not None:
+        prewarm_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await prewarm_task
+    if app.state.redis is not None:
+        await app.state.redis.aclose()
+    if app.state.client is not None:
+        app.state.client.close()
+
+
 app = FastAPI(
     title="Truth Social Investment API",
     description="API for fetching investment-related posts from Truth Social",
     version="1.0.0",
+    lifespan=lifespan,
 )
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 # Add CORS middleware
 app.add_middleware(
@@ -33,30 +152,71 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize the investment client
-client: Optional[InvestmentClient] = None
 
-
-def get_client() -> InvestmentClient:
-    """Get or create the investment client."""
-    global client
+def get_client(request: Request) -> InvestmentClient:
+    """Return the investment client created at startup."""
+    client = request.app.state.client
     if client is None:
-        username = os.getenv("TRUTHSOCIAL_USERNAME")
-        password = os.getenv("TRUTHSOCIAL_PASSWORD")
-        token = os.getenv("TRUTHSOCIAL_TOKEN")
-
-        if token:
-            client = InvestmentClient(token=token)
-        elif username and password:
-            client = InvestmentClient(username=username, password=password)
-        else:
-            raise HTTPException(
-                status_code=401,
-                detail="No credentials provided. Set TRUTHSOCIAL_USERNAME/PASSWORD or TRUTHSOCIAL_TOKEN",
-            )
+        raise HTTPException(
+            status_code=401,
+            detail="No credentials provided. Set TRUTHSOCIAL_USERNAME/PASSWORD or TRUTHSOCIAL_TOKEN",
+        )
     return client
 
 
+async def cache_get(key: str) -> Optional[bytes]:
+    """Return a cached response body, or None on a miss or cache outage."""
+    if app.state.redis is None:
+        return None
+    try:
+        return await app.state.redis.get(key)
+    except RedisError:
+        return None
+
+
+async def cache_set(key: str, value: str, ttl: int = CACHE_TTL_SECONDS) -> None:
+    """Store a response body in the cache, ignoring cache outages."""
+    if app.state.redis is None:
+        return
+    try:
+        await app.state.redis.set(key, value, ex=ttl)
+    except RedisError:
+        pass
+
+
+async def note_request(prefix: str, sector: str, limit: int) -> None:
+    """Record a request at the prewarmed limit, so the prewarm keeps it warm."""
+    if app.state.redis is None or limit != PREWARM_LIMIT:
+        return
+    try:
+        await app.state.redis.zadd(PREWARM_RECENT_KEY, {f"{prefix}:{sector}": time.time()})
+    except RedisError:
+        pass
+
+
+async def recent_requests() -> list[tuple[str, str]]:
+    """Return the (endpoint, sector) pairs requested within PREWARM_RECENT_SECONDS."""
+    try:
+        members = await app.state.redis.zrangebyscore(
+            PREWARM_RECENT_KEY, time.time() - PREWARM_RECENT_SECONDS, "+inf"
+        )
+    except RedisError as e:
+        log.warning("[Prewarm] Could not read recent requests: %s", e)
+        return []
+    recent = {m.decode() if isinstance(m, bytes) else m for m in members}
+    return [
+        (prefix, sector)
+        for sector in SECTOR_KEYS
+        for prefix in PREWARM_CALLS
+        if f"{prefix}:{sector}" in recent
+    ]
+
+
+def clamp_limit(limit: int) -> int:
+    """Clamp a client-supplied limit so cache keys stay bounded."""
+    return max(1, min(limit, MAX_LIMIT))
+
+
 class SectorInfo(BaseModel):
     """Information about a market sector."""
     name: str
@@ -86,6 +246,104 @@ class TrendingResponse(BaseModel):
     sources: list[str] = []
 
 
+def to_post_response(post) -> PostResponse:
+    """Build a PostResponse from an already-typed Post, skipping validation."""
+    return PostResponse.model_construct(
+        url=post.url,
+        content=post.content,
+        author_handle=post.author_handle,
+        author_display_name=post.author_display_name,
+        author_followers=post.author_followers,
+        engagement=post.engagement,
+        replies_count=post.replies_count,
+        reblogs_count=post.reblogs_count,
+        favourites_count=post.favourites_count,
+        created_at=post.created_at,
+    )
+
+
+def json_response(body: str | bytes, cache_status: str) -> Response:
+    """Return a pre-serialized JSON body, bypassing response_model validation."""
+    return Response(content=body, media_type="application/json", headers={"X-Cache": cache_status})
+
+
+def build_trending_body(inv_client: InvestmentClient, sector: str, hashtags: list[str], limit: int) -> str:
+    """Fetch government posts for a sector and serialize the trending response."""
+    result = inv_client.get_government_posts_for_sector(sector, limit=limit)
+    resp = TrendingResponse.model_construct(
+        sector=sector,
+        hashtags=hashtags,
+        sources=result.get("sources", []),
+        posts=[to_post_response(p) for p in result.get("posts", [])],
+    )
+    return resp.model_dump_json()
+
+
+def build_posts_body(inv_client: InvestmentClient, sector: str, hashtags: list[str], top_n: int) -> str:
+    """Fetch hashtag posts for a sector and serialize the top posts response."""
+    posts = inv_client.get_sector_posts_by_hashtag(sector, limit=top_n * 2)
+
+    # Take top_n by engagement
+    sorted_posts = heapq.nlargest(top_n, posts, key=attrgetter("engagement"))
+
+    resp = TrendingResponse.model_construct(
+        sector=sector,
+        hashtags=hashtags,
+        posts=[to_post_response(p) for p in sorted_posts],
+    )
+    return resp.model_dump_json()
+
+
+async def prewarm_cache(inv_client: InvestmentClient) -> None:
+    """Refresh cached responses for recently requested endpoints on a fixed interval.
+
+    Entries outlive the time between refreshes, so user requests for the
+    prewarmed limit are served from cache. Refreshes are spaced so they stay
+    within half of the upstream rate budget. With several workers, a Redis
+    lock lets only one of them run each cycle; it holds the lock until the
+    next cycle is due, and the others wait for it to lapse.
+    """
+    builders = {"trending": build_trending_body, "posts": build_posts_body}
+    while True:
+        token = secrets.token_hex(16)
+        started = time.monotonic()
+        acquired = False
+        try:
+            acquired = await app.state.redis.set(PREWARM_LOCK_KEY, token, nx=True, ex=PREWARM_CYCLE_SECONDS)
+        except RedisError as e:
+            log.warning("[Prewarm] Could not acquire lock: %s", e)
+
+        if acquired:
+            for prefix, sector in await recent_requests():
+                try:
+                    body = await asyncio.to_thread(
+                        builders[prefix], inv_client, sector, SECTORS[sector].hashtags, PREWARM_LIMIT
+                    )
+                except Exception as e:
+                    log.warning("[Prewarm] Failed to refresh %s for '%s': %s", prefix, sector, e)
+                else:
+                    await cache_set(f"{prefix}:{sector}:{PREWARM_LIMIT}", body, ttl=PREWARM_TTL_SECONDS)
+                # Pace refreshes to the prewarm budget, with jitter to avoid bursts
+                await asyncio.sleep(PREWARM_GAP_SECONDS[prefix] + random.uniform(1.0, 3.0))
+
+            # The next cycle is due one interval after this one started
+            wait = PREWARM_INTERVAL_SECONDS - (time.monotonic() - started)
+            try:
+                await app.state.redis.eval(
+                    PREWARM_RESCHEDULE_SCRIPT, 1, PREWARM_LOCK_KEY, token, max(int(wait * 1000), 0)
+                )
+            except RedisError as e:
+                log.warning("[Prewarm] Could not reschedule lock: %s", e)
+        else:
+            # Another worker holds the lock; retry once it lapses
+            try:
+                wait = await app.state.redis.pttl(PREWARM_LOCK_KEY) / 1000
+            except RedisError:
+                wait = PREWARM_INTERVAL_SECONDS
+
+        await asyncio.sleep(max(wait, 0) + random.uniform(0.5, 1.5))
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -96,7 +354,7 @@ async def root():
 async def list_sectors():
     """List all available sectors."""
     try:
-        return {"sectors": list(SECTORS.keys())}
+        return {"sectors": SECTOR_KEYS}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -104,13 +362,14 @@ async def list_sectors():
 @app.get("/sectors/{sector}")
 async def get_sector_info(sector: str):
     """Get information about a specific sector."""
+    sector = sector.lower()
     try:
-        if sector not in SECTORS:
+        sector_info = SECTORS.get(sector)
+        if sector_info is None:
             raise HTTPException(
                 status_code=404,
-                detail=f"Sector '{sector}' not found. Available: {list(SECTORS.keys())}",
+                detail=f"Sector '{sector}' not found. Available: {', '.join(SECTOR_KEYS)}",
             )
-        sector_info = SECTORS[sector]
         return SectorInfo(
             name=sector,
             hashtags=sector_info.hashtags,
@@ -123,40 +382,34 @@ async def get_sector_info(sector: str):
 
 
 @app.get("/sectors/{sector}/trending", response_model=TrendingResponse)
-async def get_sector_trending(sector: str, limit: int = 10):
+@limiter.limit(RATE_LIMIT)
+async def get_sector_trending(
+    request: Request,
+    sector: str,
+    limit: int = 10,
+    inv_client: InvestmentClient = Depends(get_client),
+):
     """Get trending posts for a sector from government officials."""
+    sector = sector.lower()
+    limit = clamp_limit(limit)
     try:
-        if sector not in SECTORS:
+        sector_info = SECTORS.get(sector)
+        if sector_info is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"Sector '{sector}' not found",
             )
 
-        inv_client = get_client()
-        result = inv_client.get_government_posts_for_sector(sector, limit=limit)
-        posts = result.get("posts", [])
-        sources = result.get("sources", [])
-
-        return TrendingResponse(
-            sector=sector,
-            hashtags=SECTORS[sector].hashtags,
-            sources=sources,
-            posts=[
-                PostResponse(
-                    url=getattr(p, "url", None),
-                    content=getattr(p, "content", ""),
-                    author_handle=getattr(p, "author_handle", ""),
-                    author_display_name=getattr(p, "author_display_name", ""),
-                    author_followers=getattr(p, "author_followers", 0),
-                    engagement=getattr(p, "engagement", 0),
-                    replies_count=getattr(p, "replies_count", 0),
-                    reblogs_count=getattr(p, "reblogs_count", 0),
-                    favourites_count=getattr(p, "favourites_count", 0),
-                    created_at=getattr(p, "created_at", None),
-                )
-                for p in posts
-            ],
-        )
+        await note_request("trending", sector, limit)
+        cache_key = f"trending:{sector}:{limit}"
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            return json_response(cached, "HIT")
+
+        # Upstream calls block; keep them off the event loop
+        body = await asyncio.to_thread(build_trending_body, inv_client, sector, sector_info.hashtags, limit)
+        await cache_set(cache_key, body)
+        return json_response(body, "MISS")
     except HTTPException:
         raise
     except Exception as e:
@@ -164,40 +417,34 @@ async def get_sector_trending(sector: str, limit: int = 10):
 
 
 @app.get("/sectors/{sector}/posts", response_model=TrendingResponse)
-async def get_sector_posts(sector: str, top_n: int = 10):
+@limiter.limit(RATE_LIMIT)
+async def get_sector_posts(
+    request: Request,
+    sector: str,
+    top_n: int = 10,
+    inv_client: InvestmentClient = Depends(get_client),
+):
     """Get top posts for a sector by engagement."""
+    sector = sector.lower()
+    top_n = clamp_limit(top_n)
     try:
-        if sector not in SECTORS:
+        sector_info = SECTORS.get(sector)
+        if sector_info is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"Sector '{sector}' not found",
             )
 
-        inv_client = get_client()
-        posts = inv_client.get_sector_posts_by_hashtag(sector, limit=top_n * 2)
-
-        # Sort by engagement and take top_n
-        sorted_posts = sorted(posts, key=lambda x: getattr(x, "engagement", 0), reverse=True)[:top_n]
-
-        return TrendingResponse(
-            sector=sector,
-            hashtags=SECTORS[sector].hashtags,
-            posts=[
-                PostResponse(
-                    url=getattr(p, "url", None),
-                    content=getattr(p, "content", ""),
-                    author_handle=getattr(p, "author_handle", ""),
-                    author_display_name=getattr(p, "author_display_name", ""),
-                    author_followers=getattr(p, "author_followers", 0),
-                    engagement=getattr(p, "engagement", 0),
-                    replies_count=getattr(p, "replies_count", 0),
-                    reblogs_count=getattr(p, "reblogs_count", 0),
-                    favourites_count=getattr(p, "favourites_count", 0),
-                    created_at=getattr(p, "created_at", None),
-                )
-                for p in sorted_posts
-            ],
-        )
+        await note_request("posts", sector, top_n)
+        cache_key = f"posts:{sector}:{top_n}"
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            return json_response(cached, "HIT")
+
+        # Upstream calls block; keep them off the event loop
+        body = await asyncio.to_thread(build_posts_body, inv_client, sector, sector_info.hashtags, top_n)
+        await cache_set(cache_key, body)
+        return json_response(body, "MISS")
     except HTTPException:
         raise
     except Exception as e:
@@ -206,4 +453,10 @@ async def get_sector_posts(sector: str, top_n: int = 10):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "server:app",
+        host="0.0.0.0",
+        port=8000,
+        log_level=LOG_LEVEL,
+        workers=int(os.getenv("WORKERS", "1")),
+    )
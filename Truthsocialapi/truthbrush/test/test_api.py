@@ -1,9 +1,11 @@
 from datetime import datetime, timezone
 from dateutil import parser as date_parse
 
+import curl_cffi
 import pytest
 
-from truthbrush.api import Api, LoginErrorException
+from truthbrush import api as api_module
+from truthbrush.api import Api, LoginErrorException, MAX_RETRIES
 
 
 @pytest.fixture(scope="module")
@@ -155,3 +157,84 @@ def test_pull_statuses(api):
 def test_get_auth_id_raises_login_error_exception(api):
     with pytest.raises(LoginErrorException):
         api.get_auth_id("invalid_username", "invalid_password")
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeSession:
+    """Replays a scripted sequence of responses (or exceptions) and counts calls."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+class FakeLimiter:
+    def __init__(self):
+        self.acquired = 0
+
+    def try_acquire(self, name, timeout=None):
+        self.acquired += 1
+        return True
+
+
+@pytest.fixture
+def offline_api(monkeypatch):
+    """An Api whose session, limiter and backoff sleep are stubbed out."""
+    offline = Api(token="test-token")
+    limiter = FakeLimiter()
+    monkeypatch.setattr(api_module, "API_LIMITER", limiter)
+    monkeypatch.setattr(api_module, "sleep", lambda seconds: None)
+
+    def use(session):
+        monkeypatch.setattr(offline, "_get_session", lambda: session)
+        return offline, limiter
+
+    return use
+
+
+def test_request_retries_transient_status(offline_api):
+    session = FakeSession(503, 200)
+    offline, limiter = offline_api(session)
+    assert offline._request("https://example.test").status_code == 200
+    assert session.calls == 2
+    assert limiter.acquired == 2
+
+
+def test_request_retries_curl_error(offline_api):
+    session = FakeSession(curl_cffi.curl.CurlError("reset"), 200)
+    offline, _ = offline_api(session)
+    assert offline._request("https://example.test").status_code == 200
+    assert session.calls == 2
+
+
+def test_request_does_not_retry_client_error(offline_api):
+    session = FakeSession(404)
+    offline, _ = offline_api(session)
+    assert offline._request("https://example.test").status_code == 404
+    assert session.calls == 1
+
+
+def test_request_returns_last_transient_status(offline_api):
+    session = FakeSession(*[503] * (MAX_RETRIES + 1))
+    offline, _ = offline_api(session)
+    assert offline._request("https://example.test").status_code == 503
+    assert session.calls == MAX_RETRIES + 1
+
+
+def test_request_reraises_curl_error_on_last_attempt(offline_api):
+    session = FakeSession(*[curl_cffi.curl.CurlError("reset")] * (MAX_RETRIES + 1))
+    offline, _ = offline_api(session)
+    with pytest.raises(curl_cffi.curl.CurlError):
+        offline._request("https://example.test")
+    assert session.calls == MAX_RETRIES + 1
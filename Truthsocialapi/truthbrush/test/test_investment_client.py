@@ -0,0 +1,19 @@
+from truthbrush.investment_client import MAX_CONTENT_CHARS, _html_to_text
+
+
+def test_html_to_text_strips_tags():
+    raw = "<p>Rates   are <a href=\"https://x\">#up</a></p><p>again</p>"
+    assert _html_to_text(raw) == "Rates are #up again"
+
+
+def test_html_to_text_keeps_entities_escaped():
+    assert _html_to_text("<p>a &lt;b&gt; &amp; c</p>") == "a &lt;b&gt; &amp; c"
+
+
+def test_html_to_text_plain_text_unchanged():
+    assert _html_to_text("no markup here") == "no markup here"
+
+
+def test_html_to_text_caps_length():
+    text = _html_to_text("<p>" + "x" * (MAX_CONTENT_CHARS * 2) + "</p>")
+    assert text == "x" * MAX_CONTENT_CHARS
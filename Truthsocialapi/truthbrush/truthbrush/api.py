@@ -6,9 +6,12 @@ from datetime import datetime, timezone, date
 from curl_cffi import requests
 import curl_cffi
 import json
+import orjson
 import logging
 import os
+import threading
 from dotenv import load_dotenv
+from pyrate_limiter import Duration, Limiter, Rate
 
 load_dotenv()  # take environment variables from .env.
 
@@ -37,6 +40,16 @@ TRUTHSOCIAL_PASSWORD = os.getenv("TRUTHSOCIAL_PASSWORD")
 
 TRUTHSOCIAL_TOKEN = os.getenv("TRUTHSOCIAL_TOKEN")
 
+# Transient upstream failures are retried with exponential backoff
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.3
+
+# Process-wide pacing of upstream calls, shared by all threads and clients
+API_RATE_PER_MINUTE = int(os.getenv("TRUTHSOCIAL_RATE_PER_MINUTE", "30"))
+API_MAX_DELAY = 5
+API_LIMITER = Limiter(Rate(API_RATE_PER_MINUTE, Duration.MINUTE))
+
 
 class LoginErrorException(Exception):
     pass
@@ -70,20 +83,36 @@ class Api:
         self.__username = username
         self.__password = password
         self.auth_id = token
+        self.__login_lock = threading.Lock()
+        self.__local = threading.local()
 
     def __check_login(self):
         """Runs before any login-walled function to check for login credentials and generates an auth ID token"""
-        if self.auth_id is None:
-            if self.__username is None:
-                raise LoginErrorException("Username is missing.")
-            if self.__password is None:
-                raise LoginErrorException("Password is missing.")
-            self.auth_id = self.get_auth_id(self.__username, self.__password)
-            logger.warning(f"Using token {self.auth_id}")
-
-    def _make_session(self):
-        s = requests.Session()
-        return s
+        if self.auth_id is not None:
+            return
+        # Calls may come from several worker threads; only one should log in
+        with self.__login_lock:
+            if self.auth_id is None:
+                if self.__username is None:
+                    raise LoginErrorException("Username is missing.")
+                if self.__password is None:
+                    raise LoginErrorException("Password is missing.")
+                self.auth_id = self.get_auth_id(self.__username, self.__password)
+                logger.warning(f"Using token {self.auth_id}")
+
+    def login(self):
+        """Logs in now instead of on the first login-walled call (no-op with a token)"""
+        self.__check_login()
+
+    def _get_session(self):
+        """Return this thread's persistent session so connections are reused across calls.
+
+        curl_cffi sessions are not thread-safe, so each worker thread keeps its own.
+        """
+        session = getattr(self.__local, "session", None)
+        if session is None:
+            session = self.__local.session = requests.Session()
+        return session
 
     def _check_ratelimit(self, resp):
         if resp.headers.get("x-ratelimit-limit") is not None:
@@ -110,18 +139,38 @@ class Api:
             else:
                 sleep(10)
 
+    def _request(self, url: str, params: dict = None):
+        """GET a full URL on this thread's session, retrying transient failures."""
+        for attempt in range(MAX_RETRIES + 1):
+            backoff = RETRY_BACKOFF * (2 ** attempt)
+            if not API_LIMITER.try_acquire("truthsocial", timeout=API_MAX_DELAY):
+                logger.warning(f"Local rate limit still saturated after {API_MAX_DELAY}s; sending anyway")
+            try:
+                resp = self._get_session().get(
+                    url,
+                    params=params,
+                    proxies=proxies,
+                    impersonate="chrome123",
+                    headers={
+                        "Authorization": "Bearer " + self.auth_id,
+                        "User-Agent": USER_AGENT,
+                    },
+                )
+            except curl_cffi.curl.CurlError as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                logger.warning(f"Curl error: {e}; retrying in {backoff:.1f}s")
+                sleep(backoff)
+                continue
+
+            if resp.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                return resp
+            logger.warning(f"Got status {resp.status_code} for {url}; retrying in {backoff:.1f}s")
+            sleep(backoff)
+
     def _get(self, url: str, params: dict = None) -> Any:
         try:
-            resp = self._make_session().get(
-                API_BASE_URL + url,
-                params=params,
-                proxies=proxies,
-                impersonate="chrome123",
-                headers={
-                    "Authorization": "Bearer " + self.auth_id,
-                    "User-Agent": USER_AGENT,
-                },
-            )
+            resp = self._request(API_BASE_URL + url, params=params)
         except curl_cffi.curl.CurlError as e:
             logger.error(f"Curl error: {e}")
             raise
@@ -142,7 +191,8 @@ class Api:
         self._check_ratelimit(resp)
 
         try:
-            r = resp.json()
+            # Truth Social always returns UTF-8; decode the raw bytes directly
+            r = orjson.loads(resp.content)
         except json.JSONDecodeError:
             logger.error(f"Failed to decode JSON: {resp.text[:500]}")
             r = None
@@ -156,16 +206,7 @@ class Api:
             next_link += f"?max_id={resume}"
 
         while next_link is not None:
-            resp = self._make_session().get(
-                next_link,
-                params=params,
-                proxies=proxies,
-                impersonate="chrome123",
-                headers={
-                    "Authorization": "Bearer " + self.auth_id,
-                    "User-Agent": USER_AGENT,
-                },
-            )
+            resp = self._request(next_link, params=params)
             link_header = resp.headers.get("Link", "")
             next_link = None
             for link in link_header.split(","):
@@ -174,7 +215,7 @@ class Api:
                     next_link = parts[0].strip("<>")
                     break
             logger.info(f"Next: {next_link}, resp: {resp}, headers: {resp.headers}")
-            yield resp.json()
+            yield orjson.loads(resp.content)
 
             # Will also sleep
             self._check_ratelimit(resp)
@@ -1,10 +1,19 @@
 """Investment sector client wrapper for Truth Social API."""
 
+import heapq
+import itertools
+import logging
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from operator import attrgetter
 from typing import Iterator, Optional
 from .api import Api
 
+log = logging.getLogger(__name__)
+
 
 @dataclass
 class SectorQueries:
@@ -152,7 +161,42 @@ SECTORS = {
 }
 
 
-@dataclass
+def _keyword_pattern(keywords) -> re.Pattern:
+    """Compile keywords into a single case-insensitive alternation pattern."""
+    unique = sorted(frozenset(k.lower() for k in keywords))
+    return re.compile("|".join(re.escape(k) for k in unique), re.IGNORECASE)
+
+
+# Precompiled keyword matchers, built once per sector at import time.
+# Government posts match on all sector queries; global trending matches on
+# the top 5 queries plus the sector hashtags.
+SECTOR_KEYWORD_RE = {
+    key: _keyword_pattern(sector.queries) for key, sector in SECTORS.items()
+}
+SECTOR_TRENDING_RE = {
+    key: _keyword_pattern(sector.queries[:5] + sector.hashtags)
+    for key, sector in SECTORS.items()
+}
+
+
+# Post bodies arrive as HTML; only the text (capped) is kept in memory
+MAX_CONTENT_CHARS = 1024
+_HTML_TAG_RE = re.compile(r"<[^>]*>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _html_to_text(raw: str) -> str:
+    """Strip tags from post HTML and cap it at MAX_CONTENT_CHARS.
+
+    Entities are left escaped: consumers strip tags again, and a decoded
+    "&lt;...&gt;" would be removed as if it were markup.
+    """
+    if "<" in raw:
+        raw = _WHITESPACE_RE.sub(" ", _HTML_TAG_RE.sub(" ", raw)).strip()
+    return raw[:MAX_CONTENT_CHARS]
+
+
+@dataclass(slots=True)
 class Post:
     """Represents a Truth Social post with relevant metadata."""
 
@@ -176,10 +220,10 @@ class Post:
     @classmethod
     def from_api_response(cls, data: dict) -> "Post":
         """Create Post from API response data."""
-        account = data.get("account", {})
+        account = data.get("account") or {}
         return cls(
             id=data.get("id", ""),
-            content=data.get("content", ""),
+            content=_html_to_text(data.get("content") or ""),
             created_at=data.get("created_at", ""),
             url=data.get("url", ""),
             author_handle=account.get("username", ""),
@@ -192,7 +236,7 @@ class Post:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Account:
     """Represents a Truth Social account."""
 
@@ -225,13 +269,20 @@ class Account:
 class InvestmentClient:
     """Client for retrieving investment-related content from Truth Social."""
 
-    def __init__(self, username: str = None, password: str = None, token: str = None):
+    def __init__(
+        self,
+        username: str = None,
+        password: str = None,
+        token: str = None,
+        max_workers: int = 8,
+    ):
         """Initialize the investment client.
 
         Args:
             username: Truth Social username (or set TRUTHSOCIAL_USERNAME env var)
             password: Truth Social password (or set TRUTHSOCIAL_PASSWORD env var)
             token: Pre-existing auth token (or set TRUTHSOCIAL_TOKEN env var)
+            max_workers: Size of the worker pool used for concurrent API calls
         """
         # Only pass credentials if explicitly provided, otherwise let Api use env var defaults
         kwargs = {}
@@ -242,6 +293,16 @@ class InvestmentClient:
         if token is not None:
             kwargs['token'] = token
         self.api = Api(**kwargs)
+        # Long-lived workers keep their per-thread HTTP sessions warm between calls
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def login(self) -> None:
+        """Authenticate now rather than on the first API call."""
+        self.api.login()
 
     @staticmethod
     def list_sectors() -> list[str]:
@@ -351,22 +412,28 @@ class InvestmentClient:
                     seen_ids.add(account.id)
                     yield account
 
+    def _fetch_hashtag_batch(self, tag: str, limit: int) -> list[dict]:
+        """Fetch the first batch of a hashtag timeline (max 40 posts, 1 API call)."""
+        return next(iter(self.api.hashtag(tag=tag, limit=limit)), [])
+
     def get_sector_posts_by_hashtag(
         self,
         sector: str,
         limit: int = 40,
         top_n: int = 5,
         max_hashtags: int = 5,
-        delay: float = 0.5,
+        delay: float = 0.0,
     ) -> list[Post]:
         """Get top posts from sector using hashtag timeline (rate-limit friendly).
 
+        Hashtag timelines are fetched concurrently on the client's worker pool.
+
         Args:
             sector: Sector key (use list_sectors() to see available sectors)
             limit: Posts to fetch per hashtag (40 = max per API call)
             top_n: Return only top N posts by likes
             max_hashtags: Maximum number of hashtags to query (default 5)
-            delay: Delay between hashtag queries in seconds (default 0.5)
+            delay: Stagger between starting hashtag queries in seconds (default 0)
 
         Returns:
             List of top posts sorted by favourites_count (likes)
@@ -375,33 +442,36 @@ class InvestmentClient:
         if sector_info is None:
             raise ValueError(f"Unknown sector: {sector}. Available: {list(SECTORS.keys())}")
 
+        # Query up to max_hashtags for better coverage
+        tags = sector_info.hashtags[:max_hashtags]
+        if not tags:
+            return []
+
+        futures = []
+        for i, tag in enumerate(tags):
+            if i > 0 and delay > 0:
+                time.sleep(delay)  # Optional stagger between hashtags
+            futures.append(self._executor.submit(self._fetch_hashtag_batch, tag, limit))
+        batches = [future.result() for future in futures]
+
+        # Dedupe once all hashtag batches are in, keeping hashtag order
         seen_ids = set()
+        seen_add = seen_ids.add
         all_posts = []
+        for batch in batches:
+            for status in batch:
+                if not isinstance(status, dict):
+                    continue
+                try:
+                    post = Post.from_api_response(status)
+                    if post.id and post.id not in seen_ids:
+                        seen_add(post.id)
+                        all_posts.append(post)
+                except (KeyError, TypeError, AttributeError):
+                    continue
 
-        # Query up to max_hashtags for better coverage
-        for i, tag in enumerate(sector_info.hashtags[:max_hashtags]):
-            if i > 0:
-                time.sleep(delay)  # Configurable delay between hashtags
-
-            # Fetch max 40 posts per hashtag (1 API call each)
-            for batch in self.api.hashtag(tag=tag, limit=limit):
-                if batch:
-                    for status in batch:
-                        if not isinstance(status, dict):
-                            continue
-                        try:
-                            post = Post.from_api_response(status)
-                            if post.id and post.id not in seen_ids:
-                                seen_ids.add(post.id)
-                                all_posts.append(post)
-                        except (KeyError, TypeError, AttributeError):
-                            continue
-                # Only fetch one batch (40 posts) per hashtag to minimize calls
-                break
-
-        # Sort by likes (favourites_count) and return top N
-        all_posts.sort(key=lambda p: p.favourites_count, reverse=True)
-        return all_posts[:top_n]
+        # Top N by likes (favourites_count) without sorting the whole list
+        return heapq.nlargest(top_n, all_posts, key=attrgetter("favourites_count"))
 
     def get_sector_trending(
         self,
@@ -412,7 +482,8 @@ class InvestmentClient:
         """Get trending posts and hashtags for a sector.
 
         Combines hashtag timeline + global trending filtered by sector keywords.
-        Uses max 6 API calls total (5 hashtags + 1 global trending).
+        Uses max 6 API calls total (5 hashtags + 1 global trending), all issued
+        concurrently.
 
         Args:
             sector: Sector key (use list_sectors() to see available sectors)
@@ -426,21 +497,20 @@ class InvestmentClient:
         if sector_info is None:
             raise ValueError(f"Unknown sector: {sector}. Available: {list(SECTORS.keys())}")
 
-        seen_ids = set()
-        all_posts = []
+        # Global trending is independent of the hashtag queries, so start it first
+        trending_future = self._executor.submit(self.api.trending, limit=20)
 
         # 1. Get posts from sector hashtags (up to max_hashtags API calls, 40 posts each)
         hashtag_posts = self.get_sector_posts_by_hashtag(
-            sector, limit=40, top_n=50, max_hashtags=max_hashtags, delay=0.5
+            sector, limit=40, top_n=50, max_hashtags=max_hashtags
         )
-        for post in hashtag_posts:
-            seen_ids.add(post.id)
-            all_posts.append(post)
+        seen_ids = {post.id for post in hashtag_posts}
+        seen_add = seen_ids.add
+        all_posts = list(hashtag_posts)
 
         # 2. Get global trending (1 API call, 20 posts max) and filter by sector keywords
-        global_trending = self.api.trending(limit=20) or []
-        sector_keywords = [q.lower() for q in sector_info.queries[:5]] + \
-                          [h.lower() for h in sector_info.hashtags]
+        global_trending = trending_future.result() or []
+        sector_pattern = SECTOR_TRENDING_RE[sector]
 
         for status in global_trending:
             if not isinstance(status, dict):
@@ -450,21 +520,32 @@ class InvestmentClient:
                 if not post.id or post.id in seen_ids:
                     continue
                 # Check if post content matches sector keywords
-                content_lower = (post.content or "").lower()
-                if any(kw in content_lower for kw in sector_keywords):
-                    seen_ids.add(post.id)
+                if sector_pattern.search(post.content or ""):
+                    seen_add(post.id)
                     all_posts.append(post)
             except (KeyError, TypeError, AttributeError):
                 continue
 
-        # Sort by engagement and return
-        all_posts.sort(key=lambda p: p.engagement, reverse=True)
+        # Top posts by engagement, without sorting the whole list
+        top_posts = heapq.nlargest(limit, all_posts, key=attrgetter("engagement"))
         return {
-            "posts": all_posts[:limit],
+            "posts": top_posts,
             "hashtags": sector_info.hashtags,
             "sector_name": sector_info.name,
         }
 
+    def _fetch_account_posts(self, handle: str, cutoff: datetime) -> list[Post]:
+        """Fetch an account's posts since cutoff, returning [] on failure."""
+        try:
+            return list(self.get_account_posts(
+                handle=handle,
+                limit=50,
+                created_after=cutoff,
+            ))
+        except Exception as e:
+            log.warning("[GovPosts] Error fetching from %s: %s", handle, e)
+            return []
+
     def get_government_posts_for_sector(
         self,
         sector: str,
@@ -474,8 +555,8 @@ class InvestmentClient:
         """Get government official posts relevant to a sector.
 
         Fetches recent posts from official Trump administration accounts
-        and filters by sector keywords. Falls back to recent posts if no
-        keyword matches are found.
+        concurrently and filters by sector keywords. Falls back to recent
+        posts if no keyword matches are found.
 
         Args:
             sector: Sector key (use list_sectors() to see available sectors)
@@ -485,8 +566,6 @@ class InvestmentClient:
         Returns:
             Dict with posts, hashtags, sector_name, sources, and is_filtered flag
         """
-        from datetime import datetime, timedelta, timezone
-
         sector_info = SECTORS.get(sector)
         if sector_info is None:
             raise ValueError(f"Unknown sector: {sector}. Available: {list(SECTORS.keys())}")
@@ -494,37 +573,38 @@ class InvestmentClient:
         keyword_matched_posts = []
         all_fetched_posts = []
         seen_ids = set()
+        seen_add = seen_ids.add
 
         # Calculate cutoff time
         cutoff = datetime.now(timezone.utc) - timedelta(hours=hours_back)
 
-        # Prepare keywords for matching
-        keywords = [q.lower() for q in sector_info.queries]
-        print(f"[GovPosts] Searching for sector '{sector}' with {len(keywords)} keywords")
+        # Precompiled matcher for sector keywords
+        keyword_pattern = SECTOR_KEYWORD_RE[sector]
+        log.debug("[GovPosts] Searching for sector '%s' with %d keywords", sector, len(sector_info.queries))
 
-        # Fetch from each official account
-        for handle in GOVERNMENT_ACCOUNTS:
-            try:
-                for post in self.get_account_posts(
-                    handle=handle,
-                    limit=50,
-                    created_after=cutoff.isoformat(),
-                ):
-                    if post.id in seen_ids:
-                        continue
-                    seen_ids.add(post.id)
-                    all_fetched_posts.append(post)
-
-                    # Filter by sector keywords
-                    content_lower = (post.content or "").lower()
-                    if any(kw in content_lower for kw in keywords):
-                        keyword_matched_posts.append(post)
-                        print(f"[GovPosts] Keyword match from @{handle}: {post.content[:100]}...")
-            except Exception as e:
-                print(f"[GovPosts] Error fetching from {handle}: {e}")
-                continue
+        # Fetch from all official accounts concurrently
+        account_posts = list(self._executor.map(
+            lambda handle: self._fetch_account_posts(handle, cutoff),
+            GOVERNMENT_ACCOUNTS,
+        ))
+
+        # Dedupe and filter once all accounts are in
+        for handle, posts in zip(GOVERNMENT_ACCOUNTS, account_posts):
+            for post in posts:
+                if post.id in seen_ids:
+                    continue
+                seen_add(post.id)
+                all_fetched_posts.append(post)
 
-        print(f"[GovPosts] Total fetched: {len(all_fetched_posts)}, Keyword matches: {len(keyword_matched_posts)}")
+                # Filter by sector keywords
+                if keyword_pattern.search(post.content or ""):
+                    keyword_matched_posts.append(post)
+                    log.debug("[GovPosts] Keyword match from @%s: %.100s...", handle, post.content)
+
+        log.debug(
+            "[GovPosts] Total fetched: %d, Keyword matches: %d",
+            len(all_fetched_posts), len(keyword_matched_posts),
+        )
 
         # Determine which posts to return
         is_filtered = len(keyword_matched_posts) > 0
@@ -532,14 +612,14 @@ class InvestmentClient:
             result_posts = keyword_matched_posts
         else:
             # Fallback: return recent posts when no keyword matches
-            print(f"[GovPosts] No keyword matches for '{sector}', returning recent posts as fallback")
+            log.debug("[GovPosts] No keyword matches for '%s', returning recent posts as fallback", sector)
             result_posts = all_fetched_posts
 
-        # Sort by engagement
-        result_posts.sort(key=lambda p: p.engagement, reverse=True)
+        # Top posts by engagement, without sorting the whole list
+        top_posts = heapq.nlargest(limit, result_posts, key=attrgetter("engagement"))
 
         return {
-            "posts": result_posts[:limit],
+            "posts": top_posts,
             "hashtags": sector_info.hashtags,
             "sector_name": sector_info.name,
             "sources": GOVERNMENT_ACCOUNTS,
@@ -550,36 +630,35 @@ class InvestmentClient:
         self,
         handle: str,
         limit: int = 100,
-        created_after: str = None,
+        created_after: datetime | str | None = None,
     ) -> Iterator[Post]:
         """Get posts from a specific account.
 
         Args:
             handle: Account username/handle
             limit: Maximum number of posts
-            created_after: Only get posts after this ISO datetime string
+            created_after: Only get posts after this datetime (or ISO datetime string)
 
         Yields:
             Post objects from the account
         """
-        from datetime import timezone
-        from dateutil import parser as date_parse
-
-        created_after_dt = None
-        if created_after:
-            created_after_dt = date_parse.parse(created_after)
-            if created_after_dt.tzinfo is None:
-                created_after_dt = created_after_dt.replace(tzinfo=timezone.utc)
-
-        count = 0
-        for status in self.api.pull_statuses(
+        created_after_dt = created_after or None
+        if isinstance(created_after_dt, str):
+            try:
+                created_after_dt = datetime.fromisoformat(created_after_dt)
+            except ValueError:
+                from dateutil import parser as date_parse
+                created_after_dt = date_parse.parse(created_after_dt)
+        if created_after_dt is not None and created_after_dt.tzinfo is None:
+            created_after_dt = created_after_dt.replace(tzinfo=timezone.utc)
+
+        # islice stops pulling at the limit, so no extra page is requested
+        statuses = self.api.pull_statuses(
             username=handle,
             created_after=created_after_dt,
-        ):
-            if count >= limit:
-                return
+        )
+        for status in itertools.islice(statuses, limit):
             yield Post.from_api_response(status)
-            count += 1
 
     def get_trending(self, limit: int = 20) -> list[Post]:
         """Get currently trending posts.
@@ -619,5 +698,5 @@ class InvestmentClient:
             min_followers=min_followers,
             verified_only=verified_only,
         ))
-        posts.sort(key=lambda p: p.engagement, reverse=True)
+        posts.sort(key=attrgetter("engagement"), reverse=True)
         return posts
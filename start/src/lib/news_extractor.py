@@ -1,38 +1,63 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pac
+import pyarrow.parquet as pq
 import yfinance as yf
+from yfinance.exceptions import YFException
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import zipfile
-import io
-import json
+import zlib
+import re
+import tempfile
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import multiprocessing
 import datetime
+from pathlib import Path
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from tqdm import tqdm
 
 # ==============================================================================
-# 1. DEFINE THE TARGET JSON STRUCTURE (The "Empty Shelves")
+# 1. DEFINE THE OUTPUT LAYOUT
 # ==============================================================================
-portfolio_archive = {
-    "Liquid Assets": {
-        "Liquidity": [],
-        "Stocks": [],
-        "Bonds": [],
-        "Commodities": [],
-        "Crypto currencies": []
-    },
-    "Illiquid Assets": {
-        "Real estate": [],
-        "Art and collectibles": [],
-        "Private equity": [],
-        "Direct holdings": [],
-        "Alternative energies": [],
-        "Agriculture and forestry": []
-    }
-}
+# One Parquet file per asset class: <out_dir>/<category>/<subcategory>.parquet,
+# e.g. "Illiquid Assets/Real estate.parquet". GDELT classes take their path
+# from ASSET_CONFIG; stock news has its own.
+STOCKS_PATH = ("Liquid Assets", "Stocks")
+stock_news = []
+
+# GDELT matches are collected column-wise (one list per field) per config and
+# written straight to Parquet, one file per asset class
+GDELT_FIELDS = ("timestamp", "source_url", "market_impact_score", "themes_matched")
+GDELT_OUTPUT_SCHEMA = pa.schema([
+    ("timestamp", pa.string()),
+    ("source_url", pa.string()),
+    ("market_impact_score", pa.float64()),
+    ("themes_matched", pa.list_(pa.string())),
+])
+STOCK_OUTPUT_SCHEMA = pa.schema([
+    ("timestamp", pa.string()),
+    ("ticker", pa.string()),
+    ("title", pa.string()),
+    ("source", pa.string()),
+    ("url", pa.string()),
+    ("market_impact_score", pa.float64()),
+])
 
 # ==============================================================================
 # 2. CONFIGURATION: MAPPING & DOMAIN WHITELIST
 # ==============================================================================
 
-# Mapping configs to specific paths in the JSON structure
+# Mapping configs to their category/subcategory in the output
 ASSET_CONFIG = {
     "LIQUID_LIQUIDITY": {
         
@@ -87,6 +112,9 @@ ASSET_CONFIG = {
     }
 }
 
+# Column buffers for each config's GDELT matches
+BUCKETS = {key: {field: [] for field in GDELT_FIELDS} for key in ASSET_CONFIG}
+
 # Strict Domain Whitelist (The "Quality Filter")
 TRUSTED_DOMAINS = [
     # General Finance
@@ -97,93 +125,382 @@ TRUSTED_DOMAINS = [
     "mansionglobal.com", "architecturaldigest.com", "therealdeal.com", "artnews.com", "agweb.com", "farmjournal.com"
 ]
 
+TRUSTED_SET = frozenset(TRUSTED_DOMAINS)
+
+# Host part of the GKG source column (usually a bare domain), minus any
+# scheme and leading "www."
+NETLOC_PATTERN = r'^(?:[a-z][a-z0-9+.-]*://)?(?:www\.)?(?P<host>[^/:?#]+)'
+# A trusted domain or any subdomain of it (uk.reuters.com, markets.ft.com),
+# as one anchored alternation that RE2 runs as a single automaton
+TRUSTED_HOST_PATTERN = r'(?:^|\.)(?:' + '|'.join(map(re.escape, sorted(TRUSTED_SET))) + r')$'
+
+# Byte-level prefilter run over the raw TSV so only lines that mention a
+# trusted domain get parsed (ripgrep if installed, else grep; None = off)
+def _prefilter_cmd():
+    patterns = [arg for domain in TRUSTED_DOMAINS for arg in ('-e', domain)]
+    if shutil.which('rg'):
+        return ['rg', '--no-config', '-a', '-F', '-i', *patterns]
+    if shutil.which('grep'):
+        return ['grep', '-a', '-F', '-i', *patterns]
+    return None
+
+PREFILTER_CMD = _prefilter_cmd()
+
+# ASSET_CONFIG frozen at import: path already split, patterns compiled once
+# and the target bucket resolved, so the hot loop does no dict lookups
+@dataclass(slots=True, frozen=True)
+class Config:
+    key: str
+    category: str
+    subcategory: str
+    themes: tuple
+    themes_re: re.Pattern | None # None when GDELT has no themes for the asset
+    keywords_re: re.Pattern
+    bucket: dict
+
+def _any_of(words, flags=0):
+    return re.compile('|'.join(map(re.escape, words)), flags)
+
+CONFIGS = tuple(
+    Config(
+        key=key,
+        category=criteria['path'][0],
+        subcategory=criteria['path'][1],
+        themes=tuple(criteria['themes']),
+        themes_re=_any_of(criteria['themes']) if criteria['themes'] else None,
+        keywords_re=_any_of(criteria['keywords'], re.IGNORECASE),
+        bucket=BUCKETS[key],
+    )
+    for key, criteria in ASSET_CONFIG.items()
+)
+THEME_CONFIGS = tuple(cfg for cfg in CONFIGS if cfg.themes_re is not None)
+# Configs without GDELT themes match their keywords against the article URL
+# instead (the source column is a bare domain, which never holds a keyword)
+KEYWORD_CONFIGS = tuple(cfg for cfg in CONFIGS if cfg.themes_re is None)
+
+# Every config's themes as one alternation. Arrow's regex engine (RE2) runs it
+# as a single automaton, so rows that no config can match are dropped in one
+# pass before the per-config scans
+ALL_THEMES_PATTERN = '|'.join(map(re.escape, sorted({theme for cfg in CONFIGS for theme in cfg.themes})))
+
+# Word separators in URL slugs (hyphens, underscores, path/query punctuation,
+# encoded spaces)
+URL_SEPARATORS_PATTERN = r'(?:[-_+/.?=&]|%20)+'
+
+# GKG columns we read (DATE, source, document URL, V1 themes, V1.5 tone) and
+# their types, so the CSV reader skips type inference
+GKG_COLUMNS = [1, 3, 4, 7, 15]
+GKG_SCHEMA = pa.schema([
+    ('DATE', pa.int64()),
+    ('URL', pa.string()),
+    ('DOCID', pa.string()),
+    ('THEMES', pa.string()),
+    ('TONE', pa.string()),
+])
+
+def _skip_row(row):
+    return 'skip' # Rows with a different column count
+
+# GKG is headerless and unquoted. PyArrow can tokenize it in parallel blocks,
+# but parse workers limit Arrow to one thread (see init_parse_worker)
+GKG_READ_OPTIONS = pac.ReadOptions(use_threads=True, autogenerate_column_names=True, encoding='latin1')
+GKG_PARSE_OPTIONS = pac.ParseOptions(delimiter='\t', quote_char=False, invalid_row_handler=_skip_row)
+GKG_CONVERT_OPTIONS = pac.ConvertOptions(
+    include_columns=[f'f{i}' for i in GKG_COLUMNS],
+    column_types={f'f{i}': field.type for i, field in zip(GKG_COLUMNS, GKG_SCHEMA)},
+    strings_can_be_null=False,
+)
+
+# Keep strings Arrow-backed in pandas ("string[pyarrow]") so str methods run
+# over Arrow buffers instead of one Python object per value
+ARROW_STRING_TYPES = {pa.string(): pd.StringDtype("pyarrow")}
+
+# GDELT zips downloaded concurrently
+DOWNLOAD_WORKERS = 32
+
+# Downloaded GKG zips, keyed by URL hash (historical files never change)
+CACHE_DIR = Path.home() / ".cache" / "gdelt"
+
+# One keep-alive connection pool shared by all GDELT downloads, with retries
+# on transient gateway errors
+session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=64,
+    pool_block=False,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+)
+session.mount("http://", _adapter)
+session.mount("https://", _adapter)
+
 # ==============================================================================
 # 3. ENGINE: FETCH STOCKS (Liquid Assets > Stocks)
 # ==============================================================================
+# Tickers whose news is fetched concurrently
+NEWS_WORKERS = 16
+
+def fetch_ticker_news(ticker):
+    try:
+        return ticker, yf.Ticker(ticker).news
+    # Transport errors (curl_cffi/requests exceptions are OSErrors) and bad
+    # JSON (ValueError) only cost this ticker, not the whole run
+    except (YFException, OSError, ValueError) as e:
+        print(f"Skipping {ticker}: {e}")
+        return ticker, []
+
+def news_row(ticker, item):
+    # Current yfinance items are {'id': ..., 'content': {...}}; pubDate is
+    # ISO 8601 in UTC
+    try:
+        content = item['content']
+        link = (content.get('canonicalUrl') or content.get('clickThroughUrl') or {})['url']
+        return (content['pubDate'], ticker, content['title'], content['provider']['displayName'], link)
+    except (KeyError, TypeError) as e:
+        print(f"Skipping malformed {ticker} news item: {e!r}")
+        return None
+
 def fetch_stock_history(tickers=["SPY", "QQQ", "GLD"]):
     print(f"--- FETCHING STOCK NEWS ---")
     
-    # Target location in our JSON
-    target_list = portfolio_archive["Liquid Assets"]["Stocks"]
-    
-    for ticker in tickers:
-        try:
-            t = yf.Ticker(ticker)
-            news = t.news
-            for item in news:
-                entry = {
-                    "timestamp": datetime.datetime.fromtimestamp(item['providerPublishTime']).isoformat(),
-                    "ticker": ticker,
-                    "title": item['title'],
-                    "source": item['publisher'],
-                    "url": item['link'],
-                    "market_impact_score": 0.85 # Yahoo news is already curated for impact
-                }
-                target_list.append(entry)
-        except:
-            continue
+    # One blocking round trip per ticker, so fetch them in parallel
+    rows = []
+    with ThreadPoolExecutor(max_workers=NEWS_WORKERS) as pool:
+        for ticker, news in pool.map(fetch_ticker_news, tickers):
+            rows.extend(row for item in news if (row := news_row(ticker, item)) is not None)
+
+    if not rows: return
+
+    df = pd.DataFrame(rows, columns=["timestamp", "ticker", "title", "source", "url"])
+    # Convert every publish time in one vectorized pass (UTC, like GDELT's
+    # DATE); items with an unparseable date are dropped
+    published = pd.to_datetime(df["timestamp"], utc=True, format='ISO8601', errors='coerce')
+    df = df[published.notna()].assign(
+        timestamp=published.dropna().dt.strftime('%Y-%m-%dT%H:%M:%S'),
+        market_impact_score=0.85, # Yahoo news is already curated for impact
+    )
+    stock_news.extend(df.to_dict('records'))
 
 # ==============================================================================
 # 4. ENGINE: FETCH NICHE ASSETS (GDELT STREAM)
 # ==============================================================================
+def download_gkg(url):
+    path = CACHE_DIR / f"{hashlib.sha1(url.encode()).hexdigest()}.zip"
+    if path.exists():
+        return path
+
+    # Stream to a temp file in the cache dir and rename it into place once
+    # complete, so an interrupted download is never mistaken for a cached one
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix=".part", delete=False)
+    try:
+        with tmp, session.get(url, stream=True, timeout=30) as r:
+            if r.status_code != 200:
+                raise FileNotFoundError(url)
+            for chunk in r.iter_content(chunk_size=1 << 20):
+                tmp.write(chunk)
+    except (requests.RequestException, OSError):
+        os.unlink(tmp.name)
+        return None
+    # A 200 can still be an HTML error page; never cache anything but a zip
+    if not zipfile.is_zipfile(tmp.name):
+        print(f"Discarding {url}: response is not a zip archive")
+        os.unlink(tmp.name)
+        return None
+    os.replace(tmp.name, path)
+    return path
+
+def prefetch_gkg(urls, workers=DOWNLOAD_WORKERS):
+    # Keep up to `workers` downloads in flight while the caller parses.
+    # Results come back in order, as cache paths (None if unavailable).
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for url in urls:
+            pending.append(pool.submit(download_gkg, url))
+            if len(pending) >= workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def read_gkg_tsv(f):
+    try:
+        table = pac.read_csv(f, read_options=GKG_READ_OPTIONS, parse_options=GKG_PARSE_OPTIONS,
+                             convert_options=GKG_CONVERT_OPTIONS)
+    except pa.ArrowInvalid as e:
+        if 'Empty CSV' not in str(e): raise
+        return GKG_SCHEMA.empty_table()
+    return table.rename_columns(GKG_SCHEMA.names)
+
+def _feed(src, dst, errors):
+    # Always close stdin so the prefilter sees EOF, even if reading the zip
+    # member fails (bad CRC, corrupt deflate stream); the error is kept for
+    # read_gkg to re-raise once the reader is done
+    try:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    except BrokenPipeError: # Prefilter exited early (killed or failed)
+        pass
+    except BaseException as e:
+        errors.append(e)
+    finally:
+        try:
+            dst.close()
+        except OSError:
+            pass
+
+def read_gkg(f):
+    if PREFILTER_CMD is None:
+        return read_gkg_tsv(f)
+
+    # Stream the TSV through the prefilter on a feeder thread while the CSV
+    # reader consumes the surviving lines from its stdout
+    proc = subprocess.Popen(PREFILTER_CMD, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    feed_errors = []
+    feeder = threading.Thread(target=_feed, args=(f, proc.stdin, feed_errors), daemon=True)
+    feeder.start()
+    try:
+        df = read_gkg_tsv(proc.stdout)
+    except BaseException:
+        proc.kill()
+        raise
+    finally:
+        feeder.join()
+        proc.stdout.close()
+        proc.wait()
+    if feed_errors:
+        raise feed_errors[0]
+    # grep/rg exit with 1 when nothing matched, 2 on errors
+    if proc.returncode > 1:
+        raise subprocess.CalledProcessError(proc.returncode, PREFILTER_CMD[0])
+    return df
+
+# One parse worker runs per core already, so Arrow's own thread pool would
+# only oversubscribe them
+def init_parse_worker():
+    pa.set_cpu_count(1)
+
+# Workers start from a clean forkserver (spawn where unavailable) rather than a
+# fork of this process while download threads are mid-request
+PARSE_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Runs in a worker process: parse one day's zip into {config_key: columns}
+def parse_day(path):
+    result = {}
+    with zipfile.ZipFile(path) as z:
+        with z.open(z.namelist()[0]) as f:
+            table = read_gkg(f)
+    
+    # 1. Global Filter: Trusted Domains and their subdomains only (in Arrow)
+    host = pc.struct_field(pc.extract_regex(pc.utf8_lower(table['URL']), pattern=NETLOC_PATTERN), 'host')
+    table = table.filter(pc.match_substring_regex(host, pattern=TRUSTED_HOST_PATTERN))
+    
+    if table.num_rows == 0: return result
+    df = table.to_pandas(types_mapper=ARROW_STRING_TYPES.get)
+
+    # 2. Parse Sentiment once per day into a (rows, 2) [tone, polarity] array
+    # and compute impact = |tone| * polarity / 100 in one NumPy pass.
+    # Malformed tone fields become NaN and never pass the threshold.
+    tone = (
+        df['TONE'].str.split(',', n=4, expand=True)
+        .reindex(columns=[0, 3])
+        .apply(pd.to_numeric, errors='coerce')
+        .to_numpy(dtype=np.float64, na_value=np.nan)
+    )
+    impact = np.abs(tone[:, 0]) * tone[:, 1] * 0.01
+    keep = impact > 1.5 # Market Moving Threshold
+    if not keep.any(): return result
+
+    # Only market-moving rows go on to theme matching
+    df = df[keep].assign(impact=impact[keep])
+
+    # 3. One multi-pattern pass keeps only rows carrying any config's theme
+    themed = df[df['THEMES'].str.contains(ALL_THEMES_PATTERN, na=False).to_numpy(dtype=bool)]
+
+    # 4. Every theme config's mask at once as a (rows, configs) matrix. Columns
+    # are pulled out as arrays once and indexed per config, instead of
+    # materializing a filtered copy of the frame for each config. Plain
+    # pattern strings let pandas hand the scans to Arrow's regex kernel.
+    mask_matrix = np.stack(
+        [themed['THEMES'].str.contains(cfg.themes_re.pattern, na=False).to_numpy(dtype=bool) for cfg in THEME_CONFIGS],
+        axis=1,
+    )
+    timestamps = themed['DATE'].astype(str).to_numpy(dtype=object)
+    source_urls = themed['URL'].to_numpy(dtype=object)
+    scores = themed['impact'].round(2).to_numpy()
+
+    for j, cfg in enumerate(THEME_CONFIGS):
+        rows = np.flatnonzero(mask_matrix[:, j])
+        if rows.size == 0: continue
+
+        # One regex scan per row finds every matched theme (deduped, in order seen)
+        found = themed['THEMES'].iloc[rows].str.findall(cfg.themes_re)
+        result[cfg.key] = {
+            "timestamp": timestamps[rows].tolist(),
+            "source_url": source_urls[rows].tolist(),
+            "market_impact_score": scores[rows].tolist(),
+            "themes_matched": [list(dict.fromkeys(themes)) for themes in found],
+        }
+
+    # 5. Keywords on the article URL for configs GDELT has no themes for.
+    # Slug separators become spaces so "auction-record" matches "auction record"
+    if KEYWORD_CONFIGS:
+        slugs = df['DOCID'].str.replace(URL_SEPARATORS_PATTERN, ' ', regex=True)
+    for cfg in KEYWORD_CONFIGS:
+        matches = df[slugs.str.contains(cfg.keywords_re, na=False).to_numpy(dtype=bool)]
+        if matches.empty: continue
+        result[cfg.key] = {
+            "timestamp": matches['DATE'].astype(str).tolist(),
+            "source_url": matches['URL'].tolist(),
+            "market_impact_score": matches['impact'].round(2).tolist(),
+            "themes_matched": [[] for _ in range(len(matches))],
+        }
+
+    return result
+
+def merge_into(result):
+    for cfg in CONFIGS:
+        columns = result.get(cfg.key)
+        if columns is None: continue
+        for field in GDELT_FIELDS:
+            cfg.bucket[field].extend(columns[field])
+
 def process_gdelt_stream(days_back=7): # Set to 730 for 2 years
     print(f"--- STREAMING GDELT HISTORY ({days_back} Days) ---")
     
     base = datetime.datetime.today()
     urls = [f"http://data.gdeltproject.org/gdeltv2/{(base - datetime.timedelta(days=x)).strftime('%Y%m%d')}120000.gkg.csv.zip" for x in range(days_back)]
 
-    for url in tqdm(urls):
-        try:
-            r = requests.get(url)
-            if r.status_code != 200: continue
-
-            with zipfile.ZipFile(io.BytesIO(r.content)) as z:
-                with z.open(z.namelist()[0]) as f:
-                    df = pd.read_csv(f, sep='\t', encoding='latin1', 
-                                     usecols=[1, 3, 7, 15], names=['DATE', 'URL', 'THEMES', 'TONE'])
-            
-            # 1. Global Filter: Trusted Domains Only
-            domain_mask = df['URL'].str.contains('|'.join(TRUSTED_DOMAINS), case=False, na=False)
-            df = df[domain_mask]
-            
-            if df.empty: continue
-
-            # 2. Iterate Configs to fill JSON Buckets
-            for config_key, criteria in ASSET_CONFIG.items():
-                
-                # Check Themes
-                theme_mask = df['THEMES'].str.contains('|'.join(criteria['themes']), na=False)
-                # Check Keywords (in themes or if needed, add URL check here)
-                
-                matches = df[theme_mask]
-                
-                for _, row in matches.iterrows():
-                    # Parse Sentiment
-                    try:
-                        tone_data = str(row['TONE']).split(',')
-                        impact = abs(float(tone_data[0])) * (float(tone_data[3]) / 100.0)
-                        
-                        if impact > 1.5: # Market Moving Threshold
-                            
-                            entry = {
-                                "timestamp": str(row['DATE']),
-                                "source_url": row['URL'],
-                                "market_impact_score": round(impact, 2),
-                                "themes_matched": [t for t in criteria['themes'] if t in str(row['THEMES'])]
-                            }
-                            
-                            # MAGIC: Insert into the correct nested list using the path
-                            # e.g. portfolio_archive["Illiquid Assets"]["Real estate"]
-                            category = criteria['path'][0]
-                            subcategory = criteria['path'][1]
-                            
-                            portfolio_archive[category][subcategory].append(entry)
-                            
-                    except:
-                        continue
-
-        except Exception:
-            continue
+    # Downloads run in a thread pool; each finished day is parsed in its own
+    # worker process, and results are merged back in day order
+    with ProcessPoolExecutor(mp_context=PARSE_MP_CONTEXT, initializer=init_parse_worker) as pool:
+        jobs = []
+        for path, url in zip(tqdm(prefetch_gkg(urls), total=len(urls)), urls):
+            if path is None:
+                print(f"Skipping {url}: download failed or not published")
+                continue
+            jobs.append((url, path, pool.submit(parse_day, path)))
+        for url, path, future in jobs:
+            try:
+                merge_into(future.result())
+            except (zipfile.BadZipFile, zlib.error) as e:
+                # Corrupt archive: drop it from the cache so the next run downloads it again
+                print(f"Skipping {url}: corrupt archive ({e}), removed from cache")
+                path.unlink(missing_ok=True)
+            except Exception as e:
+                print(f"Skipping {url}: {e!r}")
+
+def write_bucket(out_dir, category, subcategory, table):
+    path = Path(out_dir) / category / f"{subcategory}.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, path, compression='zstd')
+
+def save_parquet(out_dir):
+    # Stocks arrive as entry dicts; typed schema keeps an empty run readable
+    write_bucket(out_dir, *STOCKS_PATH, pa.Table.from_pylist(stock_news, schema=STOCK_OUTPUT_SCHEMA))
+
+    # One bucket at a time, straight from its column buffers
+    for cfg in CONFIGS:
+        write_bucket(out_dir, cfg.category, cfg.subcategory, pa.Table.from_pydict(cfg.bucket, schema=GDELT_OUTPUT_SCHEMA))
 
 # ==============================================================================
 # EXECUTION
@@ -197,9 +514,8 @@ if __name__ == "__main__":
     # Use days_back=3 for a quick test.
     process_gdelt_stream(days_back=3)
     
-    # 3. Save Structured JSON
-    filename = f"portfolio_intelligence_{datetime.date.today()}.json"
-    with open(filename, "w") as f:
-        json.dump(portfolio_archive, f, indent=4)
+    # 3. Save one Parquet file per bucket
+    out_dir = f"portfolio_intelligence_{datetime.date.today()}"
+    save_parquet(out_dir)
         
-    print(f"\nSUCCESS: Data saved to {filename} with full category division.")
\ No newline at end of file
+    print(f"\nSUCCESS: Data saved to {out_dir}/ as one Parquet file per asset class, with full category division.")
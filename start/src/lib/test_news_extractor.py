@@ -0,0 +1,81 @@
+import zipfile
+import zlib
+
+import pytest
+
+import news_extractor as ne
+
+DATE = "20240101120000"
+# tone, positive, negative, polarity, ...: impact = |-8| * 30 / 100 = 2.4
+MARKET_MOVING = "-8,1,9,30,0,0,0"
+QUIET = "-1,1,2,3,0,0,0"
+
+
+def gkg_row(source, doc_id, themes="", tone=MARKET_MOVING):
+    cols = [""] * 27
+    cols[0] = "1"
+    cols[1] = DATE
+    cols[3] = source
+    cols[4] = doc_id
+    cols[7] = themes
+    cols[15] = tone
+    return "\t".join(cols)
+
+
+def write_day(path, rows):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr(f"{DATE}.gkg.csv", "\n".join(rows) + "\n")
+    return path
+
+
+@pytest.fixture
+def day(tmp_path):
+    return write_day(tmp_path / "day.zip", [
+        gkg_row("reuters.com", "https://www.reuters.com/markets/bonds-1", "ECON_BOND;TAX_FNCACT;ECON_DEBT;ECON_BOND"),
+        gkg_row("uk.reuters.com", "https://uk.reuters.com/markets/gold-2", "ECON_GOLD"),
+        gkg_row("www.bloomberg.com", "https://www.bloomberg.com/news/crypto-3", "ECON_BITCOIN;ECON_BOND"),
+        gkg_row("artnews.com", "https://www.artnews.com/market/basquiat-sets-auction-record", ""),
+        # Untrusted lookalikes, a quiet day and a malformed tone never match
+        gkg_row("microsoft.com", "https://microsoft.com/bonds", "ECON_BOND"),
+        gkg_row("reuters.com.example.net", "https://reuters.com.example.net/x", "ECON_BOND"),
+        gkg_row("ft.com", "https://www.ft.com/content/quiet", "ECON_BOND", tone=QUIET),
+        gkg_row("ft.com", "https://www.ft.com/content/garbled", "ECON_BOND", tone="garbage"),
+    ])
+
+
+def test_parse_day_buckets(day):
+    result = ne.parse_day(day)
+
+    assert set(result) == {"LIQUID_BONDS", "LIQUID_COMMODITIES", "LIQUID_CRYPTO", "ILLIQUID_ART"}
+    assert result["LIQUID_BONDS"] == {
+        "timestamp": [DATE, DATE],
+        "source_url": ["reuters.com", "www.bloomberg.com"],
+        "market_impact_score": [2.4, 2.4],
+        "themes_matched": [["ECON_BOND", "ECON_DEBT"], ["ECON_BOND"]],
+    }
+    assert result["LIQUID_COMMODITIES"]["source_url"] == ["uk.reuters.com"]
+    assert result["LIQUID_CRYPTO"]["themes_matched"] == [["ECON_BITCOIN"]]
+    assert result["ILLIQUID_ART"] == {
+        "timestamp": [DATE],
+        "source_url": ["artnews.com"],
+        "market_impact_score": [2.4],
+        "themes_matched": [[]],
+    }
+
+
+def test_parse_day_untrusted_only(tmp_path):
+    path = write_day(tmp_path / "day.zip", [gkg_row("example.org", "https://example.org/bonds", "ECON_BOND")])
+    assert ne.parse_day(path) == {}
+
+
+def test_parse_day_corrupt_zip_raises(day, tmp_path):
+    data = bytearray(day.read_bytes())
+    with zipfile.ZipFile(day) as z:
+        info = z.infolist()[0]
+    start = info.header_offset + 30 + len(info.filename) + len(info.extra)
+    data[start:start + info.compress_size] = bytes(b ^ 0xFF for b in data[start:start + info.compress_size])
+    bad = tmp_path / "bad.zip"
+    bad.write_bytes(bytes(data))
+
+    with pytest.raises(zlib.error):
+        ne.parse_day(bad)